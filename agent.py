@@ -1,12 +1,109 @@
-from langchain.agents import initialize_agent, AgentType
-from langchain.agents.format_scratchpad import format_to_openai_functions
-from langchain.memory import ConversationBufferMemory
-from langchain_groq import ChatGroq
-from tools import MarketShareTool, PenetrationTool, ComparisonTool, CompetitorAnalysisTool, ForecastingTool
+# The agent executor, memory and Groq client modules are imported inside the
+# functions that build them, so importing this module stays cheap
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain.schema import SystemMessage
+from langchain.tools import BaseTool
+from typing import Any, Callable
+import functools
 import os
+from config import LLM_CONFIG, TOOL_CONFIG
 
-def create_agent(llm_model="llama3-8b-8192", temperature=0.2, max_tokens=2000, verbose=True):
+def _market_share_tool():
+    from tools import MarketShareTool
+    return MarketShareTool()
+
+def _penetration_tool():
+    from tools import PenetrationTool
+    return PenetrationTool()
+
+def _comparison_tool():
+    from tools import ComparisonTool
+    return ComparisonTool()
+
+def _competitor_analysis_tool():
+    from tools import CompetitorAnalysisTool
+    return CompetitorAnalysisTool()
+
+def _forecasting_tool():
+    from tools import ForecastingTool
+    return ForecastingTool()
+
+# Tool name -> factory; the tools module is only imported when a tool is first built
+TOOL_FACTORIES = {
+    "market_share_tool": _market_share_tool,
+    "penetration_tool": _penetration_tool,
+    "comparison_tool": _comparison_tool,
+    "competitor_analysis_tool": _competitor_analysis_tool,
+    "forecasting_tool": _forecasting_tool,
+}
+
+class LazyTool(BaseTool):
+    """Stand-in for a tool that builds the real tool on its first call and delegates to it"""
+    factory: Callable[[], BaseTool]
+    tool: Any = None
+    
+    def __init__(self, name, factory):
+        super().__init__(
+            name=name,
+            description=TOOL_CONFIG['descriptions'][name],
+            factory=factory
+        )
+    
+    def _get_tool(self):
+        if self.tool is None:
+            self.tool = self.factory()
+        return self.tool
+    
+    def _run(self, query: str = ""):
+        return self._get_tool()._run(query)
+    
+    async def _arun(self, query: str = ""):
+        return await self._get_tool()._arun(query)
+
+@functools.lru_cache(maxsize=1)
+def _groq_api_key():
+    """Read and validate GROQ_API_KEY once per process (a missing key is not cached)"""
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    return api_key
+
+@functools.lru_cache(maxsize=8)
+def _build_llm(llm_model, temperature, max_tokens, streaming):
+    """
+    Create the Groq chat model; shared by agents with the same settings. Groq has no
+    local tokenizer, so the memory's token counts come from approximate_token_ids
+    """
+    from langchain_groq import ChatGroq
+    from memory import approximate_token_ids
+    
+    return ChatGroq(
+        groq_api_key=_groq_api_key(),
+        model=llm_model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=streaming,
+        custom_get_token_ids=approximate_token_ids
+    )
+
+@functools.lru_cache(maxsize=1)
+def _build_prompt():
+    """
+    Create the agent prompt template. The system prompt is a literal message and
+    always comes first, so the request prefix is byte-identical across turns and
+    provider-side prefix caching can apply. Conversation history (with the
+    memory summary as its first message) and the new input are only ever
+    appended after it.
+    """
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=_SYSTEM_PROMPT),
+        MessagesPlaceholder(variable_name="chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+
+def create_agent(llm_model="llama3-8b-8192", temperature=0.2, max_tokens=2000, verbose=True,
+                 streaming=False, use_memory=True):
     """
     Creates a LangChain agent with the specified configuration.
     
@@ -15,56 +112,45 @@ def create_agent(llm_model="llama3-8b-8192", temperature=0.2, max_tokens=2000, v
     - temperature (float): Temperature setting for generation
     - max_tokens (int): Maximum tokens to generate
     - verbose (bool): Whether to output verbose logs
+    - streaming (bool): Whether the LLM streams tokens to callback handlers
+    - use_memory (bool): Whether to keep conversation memory between runs
     
     Returns:
     - Agent: Configured LangChain agent
     """
-    # Make sure to set GROQ_API_KEY in your environment
-    if "GROQ_API_KEY" not in os.environ:
-        raise ValueError("GROQ_API_KEY environment variable is not set")
+    from langchain.agents import AgentExecutor, OpenAIMultiFunctionsAgent
+    from memory import SummaryBufferMemory
     
-    # Initialize Groq LLM
-    llm = ChatGroq(
-        model=llm_model,
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
+    # Initialize Groq LLM (raises ValueError if GROQ_API_KEY is not set)
+    llm = _build_llm(llm_model, temperature, max_tokens, streaming)
     
-    # Create tools
-    tools = [
-        MarketShareTool(),
-        PenetrationTool(),
-        ComparisonTool(),
-        CompetitorAnalysisTool(),
-        ForecastingTool()
-    ]
-    
-    # Set up conversation memory
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    
-    # Create system prompt
-    system_prompt = create_system_prompt()
-    
-    # Create a custom prompt template
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        MessagesPlaceholder(variable_name="chat_history"),
-        ("human", "{input}"),
-        MessagesPlaceholder(variable_name="agent_scratchpad"),
-    ])
+    # Create tools, deferring construction to first use unless configured otherwise
+    if TOOL_CONFIG['eager_tools']:
+        tools = [factory() for factory in TOOL_FACTORIES.values()]
+    else:
+        tools = [LazyTool(name, factory) for name, factory in TOOL_FACTORIES.items()]
+    
+    # Set up conversation memory (per agent, never cached); older turns are
+    # summarized by the same LLM so the history sent with each request stays bounded
+    memory = None
+    if use_memory:
+        memory = SummaryBufferMemory(
+            llm=llm,
+            max_token_limit=LLM_CONFIG['memory_max_token_limit'],
+            memory_key="chat_history",
+            return_messages=True
+        )
     
-    # Initialize agent with memory
-    agent = initialize_agent(
-        tools,
-        llm,
-        agent=AgentType.OPENAI_FUNCTIONS,
-        prompt=prompt,
+    # Build the agent on the custom prompt template; the executor owns the memory
+    agent = OpenAIMultiFunctionsAgent(llm=llm, tools=tools, prompt=_build_prompt())
+    
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
         memory=memory,
         verbose=verbose,
         handle_parsing_errors=True,
     )
-    
-    return agent
 
 def create_system_prompt():
     """Generate the system prompt for the agent"""
@@ -85,5 +171,11 @@ def create_system_prompt():
     
     Available Mondelez brands: Oreo, ChipsAhoy, Ritz, belVita, NutterButter
     
+    Check previous ToolMessage responses in conversation history before making new tool calls.
+    Extract data from previous tool outputs instead of calling tools again with the same parameters.
+    Only make new calls if data is unavailable or parameters differ.
+    
     Remember to cite your data sources and explain your analytical approach.
     """
+
+_SYSTEM_PROMPT = create_system_prompt()
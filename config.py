@@ -10,6 +10,11 @@ DATA_CONFIG = {
     'brands': ["Oreo", "ChipsAhoy", "Ritz", "belVita", "NutterButter"],
     'regions': ["Northeast", "Southeast", "Midwest", "West", "Southwest"],
     'age_groups': ["18-24", "25-34", "35-44", "45-54", "55+"],
+    # 'pandas' (used by the tools) or 'polars'
+    'dataframe_backend': 'pandas',
+    # Persist generated datasets as Parquet (requires pyarrow) and reuse them across runs
+    'disk_cache': False,
+    'cache_dir': './.cache/data',
 }
 
 # LLM configuration
@@ -17,13 +22,36 @@ LLM_CONFIG = {
     'default_model': 'llama3-8b-8192',
     'temperature': 0.2,
     'max_tokens': 2000,
+    'memory_max_token_limit': 512,
+    'streaming': True,
+}
+
+# Response cache configuration
+CACHE_CONFIG = {
+    'directory': './.cache/agent',
+    'ttl_seconds': 24 * 60 * 60,
+    'memory_size': 128,
+    # Responses are only cached for deterministic runs (temperature 0)
+    # unless force is set
+    'force': False,
 }
 
 # Tool configuration
 TOOL_CONFIG = {
+    # Build every tool when the agent is created instead of on first use
+    'eager_tools': False,
+    'descriptions': {
+        'market_share_tool': "Retrieves and analyzes market share data. Specify brand, region (optional), and time period.",
+        'penetration_tool': "Retrieves and analyzes penetration data. Specify brand, age group (optional), region (optional), and time period.",
+        'comparison_tool': "Compares market share and penetration data with advanced analytics. Specify brands, regions, age groups, or metrics for comparison.",
+        'competitor_analysis_tool': "Analyzes and compares multiple brands' performance. Specify brands, metrics (market share, penetration, etc.), and regions for comparison.",
+        'forecasting_tool': "Forecasts future market share or penetration based on current trends. Specify brand, metric (market share or penetration), and time horizon.",
+    },
     'forecasting': {
         'default_horizon': 3,
         'default_arima_order': (1, 1, 0),
+        # Shorter series skip ARIMA and use the simple trend forecast
+        'min_arima_observations': 4,
         'fallback_to_simple_forecast': True,
     }
 }
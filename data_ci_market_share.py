@@ -1,9 +1,16 @@
+import functools
 import pandas as pd
 import numpy as np
-from datetime import datetime
+
+from config import DATA_CONFIG
+from data_utils import freeze_columns, month_labels, parquet_cached, region_multiplier_array, to_dataframe
+
+# Regional multipliers for the default regions, computed once at import
+_REGIONS = tuple(DATA_CONFIG['regions'])
+_REGION_MULT = region_multiplier_array(_REGIONS)
 
 def generate_market_share_data(start_date='2025-01-01', periods=7, 
-                              brands=None, regions=None, seed=42):
+                              brands=None, regions=None, seed=42, backend=None):
     """
     Generate synthetic market share data for specified Mondelez brands and regions.
     
@@ -13,24 +20,30 @@ def generate_market_share_data(start_date='2025-01-01', periods=7,
     - brands (list): List of brands to include
     - regions (list): List of regions to include
     - seed (int): Random seed for reproducibility
+    - backend (str): DataFrame backend ('pandas' or 'polars'); defaults to DATA_CONFIG
     
     Returns:
-    - pd.DataFrame: Market share dataset
+    - pd.DataFrame: Market share dataset (pl.DataFrame for the polars backend)
     """
-    np.random.seed(seed)  # For reproducibility
-    
     # Default Mondelez brands if not provided
     if brands is None:
         brands = ["Oreo", "ChipsAhoy", "Ritz", "belVita", "NutterButter"]
     if regions is None:
-        regions = ["Northeast", "Southeast", "Midwest", "West", "Southwest"]
+        regions = _REGIONS
     
-    # Convert start_date to datetime if it's a string
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-    
-    # Generate months
-    months = pd.date_range(start=start_date, periods=periods, freq='M')
+    columns = _cached_market_share(start_date, periods, tuple(brands), tuple(regions), seed)
+    categorical = {
+        "Month": pd.CategoricalDtype(month_labels(start_date, periods), ordered=True),
+        "Brand": pd.CategoricalDtype(brands),
+        "Region": pd.CategoricalDtype(regions),
+    }
+    return to_dataframe(columns, categorical=categorical, backend=backend)
+
+@functools.lru_cache(maxsize=32)
+@parquet_cached("market_share")
+def _cached_market_share(start_date, periods, brands, regions, seed):
+    """Build the market share column arrays; memoized on the (hashable) generation parameters"""
+    rng = np.random.default_rng(seed)  # Local generator for reproducibility
     
     # Base values and trends for each brand (customized for Mondelez brands)
     base_values = {
@@ -50,42 +63,42 @@ def generate_market_share_data(start_date='2025-01-01', periods=7,
     }
     
     # Region multipliers to create regional differences
-    region_multipliers = {region: 1.0 + (i-len(regions)/2)*0.05 
-                         for i, region in enumerate(regions)}
+    region_mult_arr = _REGION_MULT if regions == _REGIONS else region_multiplier_array(regions)
+    
+    # Build every (month, brand, region) combination as flat index arrays; these
+    # double as the category codes of the Month/Brand/Region columns
+    month_grid, brand_grid, region_grid = np.meshgrid(
+        np.arange(periods, dtype=np.int16), np.arange(len(brands), dtype=np.int16),
+        np.arange(len(regions), dtype=np.int16),
+        indexing='ij'
+    )
+    month_grid = month_grid.ravel()
+    brand_grid = brand_grid.ravel()
+    region_grid = region_grid.ravel()
+    n_rows = month_grid.size
+    
+    base = np.array([base_values.get(brand, 10.0) for brand in brands])[brand_grid]
+    trend = np.array([trends.get(brand, 0.1) for brand in brands])[brand_grid]
+    multiplier = region_mult_arr[region_grid]
+    
+    # Calculate market share with trend, regional adjustment and noise
+    share = (base + month_grid * trend) * multiplier + rng.normal(0, 0.3, size=n_rows)
     
-    data = []
+    # Add price data; the first two brands are premium
+    premium = np.where(brand_grid < 2, 0.5, 0.0)
+    price = 3.99 + premium + rng.normal(0, 0.1, size=n_rows)
     
-    # Generate data for each combination
-    for month_idx, month in enumerate(months):
-        month_str = month.strftime('%Y-%m')
-        
-        for brand in brands:
-            base_share = base_values.get(brand, 10.0)
-            trend = trends.get(brand, 0.1)
-            
-            for region in regions:
-                multiplier = region_multipliers.get(region, 1.0)
-                
-                # Calculate market share with trend, regional adjustment and noise
-                share = (base_share + month_idx * trend) * multiplier + np.random.normal(0, 0.3)
-                
-                # Add price data
-                premium = 0.5 if brand in brands[:2] else 0  # First two brands are premium
-                price = 3.99 + premium + np.random.normal(0, 0.1)
-                
-                # Add promotion flag
-                promo = 1 if np.random.rand() < 0.3 else 0
-                
-                data.append({
-                    "Month": month_str,
-                    "Brand": brand,
-                    "Region": region,
-                    "MarketShare": round(max(share, 0.1), 1),
-                    "Price": round(price, 2),
-                    "OnPromotion": promo
-                })
+    # Add promotion flag
+    promo = (rng.random(n_rows) < 0.3).astype(np.int8)
     
-    return pd.DataFrame(data)
+    return freeze_columns({
+        "Month": month_grid,
+        "Brand": brand_grid,
+        "Region": region_grid,
+        "MarketShare": np.round(np.maximum(share, 0.1), 1).astype(np.float32),
+        "Price": np.round(price, 2).astype(np.float32),
+        "OnPromotion": promo
+    })
 
 def get_oreo_market_share():
     """Legacy function for backward compatibility"""
@@ -1,9 +1,17 @@
+import functools
 import pandas as pd
 import numpy as np
-from datetime import datetime
+
+from config import DATA_CONFIG
+from data_utils import freeze_columns, month_labels, parquet_cached, region_multiplier_array, to_dataframe
+
+# Regional multipliers for the default regions, computed once at import
+_REGIONS = tuple(DATA_CONFIG['regions'])
+_REGION_MULT = region_multiplier_array(_REGIONS)
 
 def generate_penetration_data(start_date='2025-01-01', periods=7, 
-                             brands=None, age_groups=None, regions=None, seed=43):
+                             brands=None, age_groups=None, regions=None, seed=43,
+                             backend=None):
     """
     Generate synthetic penetration data for specified Mondelez brands, age groups and regions.
     
@@ -14,26 +22,34 @@ def generate_penetration_data(start_date='2025-01-01', periods=7,
     - age_groups (list): List of age groups to include
     - regions (list): List of regions to include
     - seed (int): Random seed for reproducibility
+    - backend (str): DataFrame backend ('pandas' or 'polars'); defaults to DATA_CONFIG
     
     Returns:
-    - pd.DataFrame: Penetration dataset
+    - pd.DataFrame: Penetration dataset (pl.DataFrame for the polars backend)
     """
-    np.random.seed(seed)  # For reproducibility
-    
     # Default values if not provided
     if brands is None:
         brands = ["Oreo", "ChipsAhoy", "Ritz", "belVita", "NutterButter"]
     if age_groups is None:
         age_groups = ["18-24", "25-34", "35-44", "45-54", "55+"]
-
-    regions = ["Northeast", "Southeast", "Midwest", "West", "Southwest"]
-    
-    # Convert start_date to datetime if it's a string
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    if regions is None:
+        regions = _REGIONS
     
-    # Generate months
-    months = pd.date_range(start=start_date, periods=periods, freq='M')
+    columns = _cached_penetration(start_date, periods, tuple(brands), tuple(age_groups),
+                                  tuple(regions), seed)
+    categorical = {
+        "Month": pd.CategoricalDtype(month_labels(start_date, periods), ordered=True),
+        "Brand": pd.CategoricalDtype(brands),
+        "AgeGroup": pd.CategoricalDtype(age_groups),
+        "Region": pd.CategoricalDtype(regions),
+    }
+    return to_dataframe(columns, categorical=categorical, backend=backend)
+
+@functools.lru_cache(maxsize=32)
+@parquet_cached("penetration")
+def _cached_penetration(start_date, periods, brands, age_groups, regions, seed):
+    """Build the penetration column arrays; memoized on the (hashable) generation parameters"""
+    rng = np.random.default_rng(seed)  # Local generator for reproducibility
     
     # Base values for each brand (customized for Mondelez)
     base_values = {
@@ -49,50 +65,60 @@ def generate_penetration_data(start_date='2025-01-01', periods=7,
         "18-24": {"Oreo": 1.3, "ChipsAhoy": 1.2, "Ritz": 0.9, "belVita": 0.8, "NutterButter": 0.9},
         "25-34": {"Oreo": 1.2, "ChipsAhoy": 1.1, "Ritz": 1.0, "belVita": 1.2, "NutterButter": 0.9},
         "35-44": {"Oreo": 1.1, "ChipsAhoy": 1.0, "Ritz": 1.1, "belVita": 1.3, "NutterButter": 1.0},
-        "45-54": {"Oreo": 0.9, "ChipsAhay": 0.9, "Ritz": 1.2, "belVita": 1.1, "NutterButter": 1.1},
+        "45-54": {"Oreo": 0.9, "ChipsAhoy": 0.9, "Ritz": 1.2, "belVita": 1.1, "NutterButter": 1.1},
         "55+": {"Oreo": 0.8, "ChipsAhoy": 0.8, "Ritz": 1.1, "belVita": 0.9, "NutterButter": 1.2}
     }
     
     # Region preferences (multipliers)
-    region_multipliers = {region: 1.0 + (i-len(regions)/2)*0.05 
-                         for i, region in enumerate(regions)}
+    region_mult_arr = _REGION_MULT if regions == _REGIONS else region_multiplier_array(regions)
+    
+    # Age multipliers as an (age group, brand) matrix. Brands and age groups
+    # outside the table stay neutral, but a known brand missing from a known
+    # age group raises a KeyError instead of silently falling back to 1.0
+    age_mult_mat = np.array([
+        [age_multipliers[age_group][brand]
+         if age_group in age_multipliers and brand in base_values else 1.0
+         for brand in brands]
+        for age_group in age_groups
+    ])
+    
+    # Build every (month, brand, age group, region) combination as flat index
+    # arrays; these double as the category codes of the dimension columns
+    month_grid, brand_grid, age_grid, region_grid = np.meshgrid(
+        np.arange(periods, dtype=np.int16), np.arange(len(brands), dtype=np.int16),
+        np.arange(len(age_groups), dtype=np.int16), np.arange(len(regions), dtype=np.int16),
+        indexing='ij'
+    )
+    month_grid = month_grid.ravel()
+    brand_grid = brand_grid.ravel()
+    age_grid = age_grid.ravel()
+    region_grid = region_grid.ravel()
+    n_rows = month_grid.size
+    
+    base_pen = np.array([base_values.get(brand, 5.0) for brand in brands])[brand_grid]
+    lead_brand = brand_grid == 0  # First brand growing faster
+    brand_trend = np.where(lead_brand, 0.3, 0.1)
+    age_mult = age_mult_mat[age_grid, brand_grid]
+    region_mult = region_mult_arr[region_grid]
+    
+    # Calculate penetration with trends and adjustments
+    penetration = (base_pen + month_grid * brand_trend) * age_mult * region_mult + rng.normal(0, 0.2, size=n_rows)
     
-    data = []
+    # Add purchase frequency data
+    purch_freq = 2.0 + np.where(lead_brand, 0.5, 0.0) + rng.normal(0, 0.2, size=n_rows)
     
-    # Generate data for each combination
-    for month_idx, month in enumerate(months):
-        month_str = month.strftime('%Y-%m')
-        
-        for brand in brands:
-            base_pen = base_values.get(brand, 5.0)
-            brand_trend = 0.3 if brand == brands[0] else 0.1  # First brand growing faster
-            
-            for age_group in age_groups:
-                age_mult = age_multipliers.get(age_group, {}).get(brand, 1.0)
-                
-                for region in regions:
-                    region_mult = region_multipliers.get(region, 1.0)
-                    
-                    # Calculate penetration with trends and adjustments
-                    penetration = (base_pen + month_idx * brand_trend) * age_mult * region_mult + np.random.normal(0, 0.2)
-                    
-                    # Add purchase frequency data
-                    purch_freq = 2.0 + (0.5 if brand == brands[0] else 0) + np.random.normal(0, 0.2)
-                    
-                    # Add loyalty score
-                    loyalty = 65 + (10 if brand == brands[0] else 0) + np.random.normal(0, 3)
-                    
-                    data.append({
-                        "Month": month_str,
-                        "Brand": brand,
-                        "AgeGroup": age_group,
-                        "Region": region,
-                        "Penetration": round(max(penetration, 0.1), 1),
-                        "PurchaseFrequency": round(purch_freq, 1),
-                        "LoyaltyScore": round(loyalty, 1)
-                    })
+    # Add loyalty score
+    loyalty = 65 + np.where(lead_brand, 10, 0) + rng.normal(0, 3, size=n_rows)
     
-    return pd.DataFrame(data)
+    return freeze_columns({
+        "Month": month_grid,
+        "Brand": brand_grid,
+        "AgeGroup": age_grid,
+        "Region": region_grid,
+        "Penetration": np.round(np.maximum(penetration, 0.1), 1).astype(np.float32),
+        "PurchaseFrequency": np.round(purch_freq, 1).astype(np.float32),
+        "LoyaltyScore": np.round(loyalty, 1).astype(np.float32)
+    })
 
 def get_oreo_penetration():
     """Legacy function for backward compatibility"""
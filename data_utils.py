@@ -0,0 +1,100 @@
+import functools
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from config import DATA_CONFIG
+
+def region_multiplier_array(regions):
+    """Regional multipliers, stepping 5% per position in the regions list"""
+    return 1.0 + (np.arange(len(regions)) - len(regions) / 2) * 0.05
+
+def month_labels(start_date, periods):
+    """'YYYY-MM' labels for the generated months, used as the Month categories"""
+    # Convert start_date to datetime if it's a string
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    months = pd.date_range(start=start_date, periods=periods, freq='ME')
+    return months.strftime('%Y-%m').to_numpy()
+
+def freeze_columns(columns):
+    """Mark cached column arrays read-only so callers cannot corrupt the cache"""
+    for values in columns.values():
+        values.setflags(write=False)
+    return columns
+
+# Version of the cached column layout, hashed into every Parquet cache key. Bump it
+# whenever the stored columns change (names, dtypes, labels vs category codes) so
+# files written by older code are never read back
+CACHE_FORMAT_VERSION = 3
+
+def parquet_cached(name):
+    """
+    Decorator that persists a column-array builder's output to Parquet when
+    DATA_CONFIG['disk_cache'] is enabled, so later processes memory-map the
+    file instead of regenerating the data.
+
+    Parameters:
+    - name (str): Dataset name used as the cache file prefix
+    """
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(*args):
+            if not DATA_CONFIG['disk_cache']:
+                return build(*args)
+            
+            key = (CACHE_FORMAT_VERSION, args)
+            digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+            cache_path = Path(DATA_CONFIG['cache_dir']) / f"{name}_{digest}.parquet"
+            if cache_path.exists():
+                df = pd.read_parquet(cache_path, memory_map=True)
+                return freeze_columns({column: df[column].to_numpy() for column in df.columns})
+            
+            columns = build(*args)
+            # Write to a temporary file first so concurrent runs never read a partial file
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            pd.DataFrame(columns).to_parquet(tmp_path, compression='zstd', index=False)
+            os.replace(tmp_path, cache_path)
+            return columns
+        return wrapper
+    return decorator
+
+def to_dataframe(columns, categorical=None, backend=None):
+    """
+    Build a DataFrame from a dict of column arrays.
+
+    Parameters:
+    - columns (dict): Column name -> NumPy array; categorical columns hold integer codes
+    - categorical (dict): Column name -> pd.CategoricalDtype for the coded columns
+    - backend (str): 'pandas' or 'polars'; defaults to DATA_CONFIG['dataframe_backend']
+
+    Returns:
+    - pd.DataFrame or pl.DataFrame: Dataset in the requested backend
+    """
+    backend = backend or DATA_CONFIG['dataframe_backend']
+    categorical = categorical or {}
+
+    if backend == 'polars':
+        # Optional dependency, only needed when the polars backend is selected
+        import polars as pl
+        data = dict(columns)
+        for column, dtype in categorical.items():
+            data[column] = np.asarray(dtype.categories)[columns[column]]
+        df = pl.DataFrame(data)
+        return df.with_columns([pl.col(column).cast(pl.Categorical) for column in categorical])
+
+    if backend != 'pandas':
+        raise ValueError(f"Unknown dataframe backend: {backend}")
+
+    # Categoricals are built straight from their codes, so no string column is
+    # ever materialized. Fixed category sets keep dtypes identical across calls
+    # and datasets. The dict constructor copies the arrays, so the frame is safe
+    # to mutate
+    data = dict(columns)
+    for column, dtype in categorical.items():
+        data[column] = pd.Categorical.from_codes(columns[column], dtype=dtype)
+    return pd.DataFrame(data)
@@ -1,7 +1,11 @@
 import os
 from dotenv import load_dotenv
-from agent import create_agent
+from config import CACHE_CONFIG, DATA_CONFIG, LLM_CONFIG
 import argparse
+import asyncio
+
+# LangChain, the agent and the cache backends are imported where they are first
+# needed so that --help and argument errors return without loading them
 
 # Load environment variables if using .env file
 load_dotenv()
@@ -23,13 +27,15 @@ def display_welcome():
     print("\nType 'exit' to quit or 'help' for more information.")
     print("="*80 + "\n")
 
-def run_interactive_mode(agent):
-    """Run the agent in interactive mode"""
+async def run_interactive_mode(agent, stream=False):
+    """Run the agent in interactive mode on a single event loop"""
     display_welcome()
     
     while True:
-        # Get query from user
-        query = input("\nEnter your query (or 'exit' to quit, 'help' for assistance): ")
+        # Get query from user without blocking the event loop
+        query = await asyncio.to_thread(
+            input, "\nEnter your query (or 'exit' to quit, 'help' for assistance): "
+        )
         
         if query.lower() == 'exit':
             print("Thank you for using the CPG Market Analysis System. Goodbye!")
@@ -40,12 +46,7 @@ def run_interactive_mode(agent):
                 
         # Run the agent with user query
         print("\nProcessing your query... This may take a moment.")
-        result = agent.run(query)
-        
-        print("\nAnalysis Results:")
-        print("-" * 80)
-        print(result)
-        print("-" * 80)
+        await run_agent(agent, query, stream=stream)
 
 def display_help():
     """Display help information"""
@@ -63,38 +64,146 @@ def display_help():
     print("Available age groups: 18-24, 25-34, 35-44, 45-54, 55+")
     print("="*80 + "\n")
 
-def process_single_query(agent, query):
-    """Process a single query and return the result"""
-    print(f"Processing query: {query}")
-    result = agent.run(query)
+def print_result(result):
+    """Print an analysis result block"""
     print("\nAnalysis Results:")
     print("-" * 80)
     print(result)
     print("-" * 80)
+
+async def run_agent(agent, query, stream=False):
+    """
+    Run the agent on a query and print the result, streaming tokens as they arrive if requested.
+    The async path lets the agent execute independent tool calls concurrently.
+    """
+    if not stream:
+        response = await agent.ainvoke({"input": query})
+        print_result(response["output"])
+        return response["output"]
+    
+    from streaming import CountingStdOutHandler
+    
+    handler = CountingStdOutHandler()
+    print("\nAnalysis Results:")
+    print("-" * 80)
+    response = await agent.ainvoke({"input": query}, config={"callbacks": [handler]})
+    # Some responses reach the executor without token callbacks; print those whole
+    if handler.tokens == 0:
+        print(response["output"], end="")
+    print("\n" + "-" * 80)
+    return response["output"]
+
+async def process_single_query(agent, query, cache=None, model=None, temperature=None, stream=False):
+    """Process a single query and return the result, using the response cache if given"""
+    print(f"Processing query: {query}")
+    key = None
+    result = None
+    if cache is not None:
+        key = cache.cache_key(model, temperature, query.strip().lower(),
+                              DATA_CONFIG['start_date'], DATA_CONFIG['periods'])
+        result = cache.get(key)
+    
+    if result is None:
+        result = await run_agent(agent, query, stream=stream)
+        if cache is not None:
+            cache.set(key, result)
+    else:
+        print_result(result)
+    
+    if cache is not None:
+        print(cache.stats())
     return result
 
+async def run_batch(agent, queries, concurrency=5):
+    """
+    Run independent queries concurrently against a shared agent.
+    
+    Parameters:
+    - agent: Agent to run the queries with
+    - queries (list): Queries to process
+    - concurrency (int): Maximum number of queries in flight at once
+    
+    Returns:
+    - list: Result (or raised exception) for each query, in submission order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_one(query):
+        async with semaphore:
+            response = await agent.ainvoke({"input": query})
+            return response["output"]
+    
+    return await asyncio.gather(*(run_one(query) for query in queries), return_exceptions=True)
+
+def process_queries_file(agent, path, concurrency=5):
+    """Process every non-empty line of a file as a query and print the results in order"""
+    with open(path) as f:
+        queries = [line.strip() for line in f if line.strip()]
+    
+    print(f"Processing {len(queries)} queries (up to {concurrency} at a time)...")
+    results = asyncio.run(run_batch(agent, queries, concurrency))
+    
+    for i, (query, result) in enumerate(zip(queries, results), 1):
+        print(f"\nQuery {i}: {query}")
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+        else:
+            print_result(result)
+    return results
+
 def main():
     """Main function to run the application"""
     parser = argparse.ArgumentParser(description='CPG Market Analysis System')
     parser.add_argument('--query', '-q', type=str, help='Single query to process')
+    parser.add_argument('--queries-file', type=str,
+                        help='File with one query per line, processed concurrently')
+    parser.add_argument('--max-concurrency', type=int, default=5,
+                        help='Maximum queries in flight with --queries-file (default: 5)')
     parser.add_argument('--model', '-m', type=str, default='llama3-8b-8192', 
                         help='LLM model to use (default: llama3-8b-8192)')
     parser.add_argument('--temperature', '-t', type=float, default=0.2,
                         help='Temperature setting for generation (default: 0.2)')
+    parser.add_argument('--force-cache', action='store_true',
+                        help='Cache responses even when temperature is not 0')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the response cache')
+    parser.add_argument('--stream', action=argparse.BooleanOptionalAction,
+                        default=LLM_CONFIG['streaming'],
+                        help='Stream the answer as it is generated (default: %(default)s)')
     args = parser.parse_args()
     
     try:
-        # Create agent with specified parameters
+        from agent import create_agent
+        
+        # Create agent with specified parameters. Batch queries are independent,
+        # so they share one agent without conversation memory and are not streamed.
+        # Verbose chain logs would interleave with streamed tokens, so they are
+        # only shown when the answer is not streamed
+        batch = args.queries_file is not None
+        streaming = args.stream and not batch
         agent = create_agent(
             llm_model=args.model,
-            temperature=args.temperature
+            temperature=args.temperature,
+            verbose=not streaming,
+            streaming=streaming,
+            use_memory=not batch
         )
         
-        # Either process a single query or run in interactive mode
-        if args.query:
-            process_single_query(agent, args.query)
+        # Process a batch of queries, a single query or run in interactive mode
+        if batch:
+            process_queries_file(agent, args.queries_file, args.max_concurrency)
+        elif args.query:
+            cache = None
+            force_cache = args.force_cache or CACHE_CONFIG['force']
+            if not args.no_cache and (args.temperature == 0 or force_cache):
+                from query_cache import LLMCache
+                cache = LLMCache()
+            asyncio.run(process_single_query(agent, args.query, cache=cache, model=args.model,
+                                             temperature=args.temperature, stream=args.stream))
+            if cache is not None:
+                cache.close()
         else:
-            run_interactive_mode(agent)
+            asyncio.run(run_interactive_mode(agent, stream=args.stream))
             
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,33 @@
+import asyncio
+import re
+from langchain.memory import ConversationSummaryBufferMemory
+
+# Words and individual punctuation marks, roughly one BPE token each for English text
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def approximate_token_ids(text):
+    """
+    Token ids for models without a local tokenizer, such as ChatGroq. Without this,
+    LangChain falls back to the GPT-2 tokenizer from transformers, which is not a
+    dependency. The ids are placeholders: the conversation memory only counts them
+    to decide when to summarize older turns.
+
+    Parameters:
+    - text (str): Text to tokenize
+
+    Returns:
+    - list: One id per word or punctuation mark
+    """
+    return [0] * len(_TOKEN_RE.findall(text))
+
+class SummaryBufferMemory(ConversationSummaryBufferMemory):
+    """
+    ConversationSummaryBufferMemory that also summarizes on the async path. The
+    base class only prunes in save_context; asave_context (used by ainvoke) just
+    appends messages, so history would grow without bound.
+    """
+
+    async def asave_context(self, inputs, outputs):
+        await super().asave_context(inputs, outputs)
+        # prune() may call the LLM synchronously to extend the summary
+        await asyncio.get_running_loop().run_in_executor(None, self.prune)
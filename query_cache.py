@@ -0,0 +1,65 @@
+import hashlib
+import json
+from collections import OrderedDict
+import diskcache
+
+from config import CACHE_CONFIG
+
+class LLMCache:
+    """
+    Two-level cache for agent responses: a small in-memory LRU in front of a
+    persistent diskcache store.
+
+    Parameters:
+    - directory (str): Directory for the on-disk cache
+    - ttl (int): Time-to-live in seconds for on-disk entries
+    - memory_size (int): Maximum number of entries kept in memory
+    """
+
+    def __init__(self, directory=None, ttl=None, memory_size=None):
+        self.ttl = ttl if ttl is not None else CACHE_CONFIG['ttl_seconds']
+        self.memory_size = memory_size if memory_size is not None else CACHE_CONFIG['memory_size']
+        self._memory = OrderedDict()
+        self._disk = diskcache.Cache(directory or CACHE_CONFIG['directory'])
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(*parts):
+        """Build a stable key from the model settings, query and data parameters"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        value = self._disk.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store value under key in both cache levels"""
+        self._disk.set(key, value, expire=self.ttl)
+        self._remember(key, value)
+
+    def stats(self):
+        """Return a short summary of cache hits and misses"""
+        return f"Cache hits: {self.hits}, misses: {self.misses}"
+
+    def close(self):
+        self._disk.close()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
@@ -0,0 +1,14 @@
+from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+
+class CountingStdOutHandler(StreamingStdOutCallbackHandler):
+    """Streams LLM tokens to stdout and counts the non-empty ones"""
+    
+    def __init__(self):
+        super().__init__()
+        self.tokens = 0
+    
+    def on_llm_new_token(self, token, **kwargs):
+        # Function-call steps stream empty content chunks
+        if token:
+            self.tokens += 1
+        super().on_llm_new_token(token, **kwargs)
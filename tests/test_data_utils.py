@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import data_utils
+from config import DATA_CONFIG
+from data_ci_market_share import _cached_market_share, generate_market_share_data
+from data_panel_penetration import _cached_penetration, generate_penetration_data
+from data_utils import parquet_cached
+from query_cache import LLMCache
+
+def _clear_memoized():
+    _cached_market_share.cache_clear()
+    _cached_penetration.cache_clear()
+
+class ParquetCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        patcher = mock.patch.dict(DATA_CONFIG, {'disk_cache': True, 'cache_dir': tmp.name,
+                                                'dataframe_backend': 'pandas'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _clear_memoized()
+        self.addCleanup(_clear_memoized)
+
+    def test_generators_round_trip_through_parquet(self):
+        for name, generate in [("market_share", generate_market_share_data),
+                               ("penetration", generate_penetration_data)]:
+            with self.subTest(name):
+                built = generate()
+                files = list(self.cache_dir.glob(f"{name}_*.parquet"))
+                self.assertEqual(len(files), 1)
+                written = files[0].stat().st_mtime_ns
+
+                # Drop the in-process memo so the second call reads the file back
+                _clear_memoized()
+                loaded = generate()
+                self.assertTrue(loaded.equals(built))
+                self.assertEqual(loaded.dtypes.to_dict(), built.dtypes.to_dict())
+                self.assertEqual(files[0].stat().st_mtime_ns, written)
+
+    def test_stale_format_version_is_not_reused(self):
+        calls = []
+
+        def builder(values):
+            @parquet_cached("layout")
+            def build(n):
+                calls.append(n)
+                return {"Value": values[:n]}
+            return build
+
+        # A file written under the previous layout: labels instead of codes
+        with mock.patch.object(data_utils, "CACHE_FORMAT_VERSION", data_utils.CACHE_FORMAT_VERSION - 1):
+            builder(np.array(["a", "b", "c"]))(3)
+
+        columns = builder(np.array([0, 1, 2], dtype=np.int16))(3)
+        self.assertEqual(calls, [3, 3])
+        np.testing.assert_array_equal(columns["Value"], [0, 1, 2])
+        self.assertEqual(len(list(self.cache_dir.glob("layout_*.parquet"))), 2)
+
+        # The current version's file is reused
+        columns = builder(np.array([0, 1, 2], dtype=np.int16))(3)
+        self.assertEqual(calls, [3, 3])
+        self.assertEqual(columns["Value"].dtype, np.int16)
+
+class LLMCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = os.path.join(tmp.name, "responses")
+        self.cache = LLMCache(directory=self.directory, ttl=60, memory_size=1)
+        self.addCleanup(self.cache.close)
+
+    def test_get_and_set_across_memory_and_disk(self):
+        first = LLMCache.cache_key("llama3-8b-8192", 0.2, "oreo market share")
+        second = LLMCache.cache_key("llama3-8b-8192", 0.2, "ritz penetration")
+        self.assertIsNone(self.cache.get(first))
+
+        self.cache.set(first, "Oreo leads with 24.9%")
+        self.cache.set(second, "Ritz reaches 15.6%")
+        # memory_size=1: the first entry was evicted from memory and is served from disk
+        self.assertNotIn(first, self.cache._memory)
+        self.assertEqual(self.cache.get(first), "Oreo leads with 24.9%")
+        self.assertIn(first, self.cache._memory)
+        self.assertEqual(self.cache.get(first), "Oreo leads with 24.9%")
+        self.assertEqual(self.cache.stats(), "Cache hits: 2, misses: 1")
+
+        # A new process only has the disk level
+        reopened = LLMCache(directory=self.directory, ttl=60)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get(second), "Ritz reaches 15.6%")
+        self.assertIsNone(reopened.get(LLMCache.cache_key("llama3-8b-8192", 0.2, "belvita")))
+
+if __name__ == "__main__":
+    unittest.main()
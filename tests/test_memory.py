@@ -0,0 +1,58 @@
+import asyncio
+import os
+import unittest
+
+from langchain_core.language_models import FakeListChatModel
+
+from config import LLM_CONFIG
+from memory import SummaryBufferMemory, approximate_token_ids
+
+def _fake_llm():
+    return FakeListChatModel(
+        responses=["The user asked about Oreo market share."] * 10,
+        custom_get_token_ids=approximate_token_ids
+    )
+
+def _turn(i):
+    return {"input": f"Question {i} about Oreo market share " + "trend " * 150}, {"output": "analysis " * 200}
+
+def _memory():
+    return SummaryBufferMemory(
+        llm=_fake_llm(),
+        max_token_limit=LLM_CONFIG['memory_max_token_limit'],
+        memory_key="chat_history",
+        return_messages=True
+    )
+
+class SummaryMemoryTest(unittest.TestCase):
+    def test_agent_memory_counts_tokens_without_transformers(self):
+        os.environ.setdefault("GROQ_API_KEY", "test-key")
+        from agent import create_agent
+        
+        memory = create_agent(verbose=False).memory
+        self.assertEqual(memory.llm.get_num_tokens("Oreo's share rose 2.5 points"), 9)
+    
+    def assertSummarized(self, memory):
+        self.assertEqual(memory.moving_summary_buffer, "The user asked about Oreo market share.")
+        self.assertLess(len(memory.chat_memory.messages), 10)
+        self.assertLessEqual(memory.llm.get_num_tokens_from_messages(memory.chat_memory.messages),
+                             LLM_CONFIG['memory_max_token_limit'])
+    
+    def test_save_context_summarizes_older_turns(self):
+        memory = _memory()
+        for i in range(5):
+            memory.save_context(*_turn(i))
+        self.assertSummarized(memory)
+    
+    def test_asave_context_summarizes_older_turns(self):
+        memory = _memory()
+        
+        async def save_turns():
+            for i in range(5):
+                await memory.asave_context(*_turn(i))
+        
+        asyncio.run(save_turns())
+        self.assertSummarized(memory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,22 +1,152 @@
 from langchain.tools import BaseTool
+import asyncio
+import functools
+import re
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
-from statsmodels.tsa.arima.model import ARIMA
-import io
-import base64
+from config import DATA_CONFIG, TOOL_CONFIG
+
+# scipy and statsmodels are imported inside the functions that use them, so building
+# or importing the other tools does not pay for them
 
 # Import data generator functions instead of specific dataset functions
 from data_ci_market_share import generate_market_share_data
 from data_panel_penetration import generate_penetration_data
 
-class MarketShareTool(BaseTool):
+# Lowercase brand/region keys (as extracted from queries) -> names in the data
+_BRAND_NAMES = {brand.lower(): brand for brand in DATA_CONFIG['brands']}
+_REGION_NAMES = {region.lower(): region for region in DATA_CONFIG['regions']}
+
+# Query vocabularies, matched against the lowercased query in a single scan;
+# the earliest mention in the query wins
+_BRAND_RE = re.compile('|'.join(map(re.escape, _BRAND_NAMES)))
+_REGION_RE = re.compile('|'.join(map(re.escape, _REGION_NAMES)))
+_AGE_GROUP_RE = re.compile('|'.join(map(re.escape, DATA_CONFIG['age_groups'])))
+
+def _index_by(df, levels):
+    """Index a dataset by its dimension columns, sorted so filters are index lookups"""
+    return df.set_index(levels).sort_values(levels + ['Month'])
+
+# Each dataset is built and indexed once per process and shared by every tool
+# call; the tools only read from these frames and never modify them in place.
+# The tools need the pandas backend whatever DATA_CONFIG selects: its Month,
+# Brand, Region and AgeGroup columns are categoricals built from integer codes,
+# so the index lookups and groupbys work on codes, not strings
+@functools.lru_cache(maxsize=1)
+def _market_share_data():
+    return _index_by(generate_market_share_data(backend='pandas'), ['Brand', 'Region'])
+
+@functools.lru_cache(maxsize=1)
+def _penetration_data():
+    return _index_by(generate_penetration_data(backend='pandas'), ['Brand', 'AgeGroup', 'Region'])
+
+@functools.lru_cache(maxsize=1)
+def _endpoints():
+    """
+    First- and last-month values of both measures per Brand/Region (penetration
+    averaged over age groups), with (measure, 'first'/'last') columns. Every
+    Brand/Region cell holds the same number of rows, so averaging these over
+    regions gives the brand-level endpoints.
+    """
+    tables = {}
+    for column, df in (('MarketShare', _market_share_data()), ('Penetration', _penetration_data())):
+        monthly = df.groupby(['Brand', 'Region', 'Month'], observed=True)[column].mean()
+        tables[column] = monthly.groupby(level=['Brand', 'Region'], observed=True).agg(['first', 'last'])
+    return pd.concat(tables, axis=1)
+
+@functools.lru_cache(maxsize=8)
+def _brand_endpoints(region=None):
+    """Per-brand endpoints table for one region, or averaged over all regions for None"""
+    if region:
+        return _endpoints().xs(region, level='Region')
+    return _endpoints().groupby(level='Brand', observed=True).mean()
+
+def _select(df, **levels):
+    """
+    Select rows of an indexed dataset by index level, e.g. _select(df, Brand='Oreo', Region=None)
+    (None matches everything), returned as a flat frame in month order.
+    """
+    key = tuple(levels.get(level) or slice(None) for level in df.index.names)
+    selected = df.loc[key, :].reset_index()
+    selected = selected[['Month'] + [col for col in selected.columns if col != 'Month']]
+    return selected.sort_values('Month', kind='stable', ignore_index=True)
+
+def clear_data_cache():
+    """Drop the shared datasets so the next tool call regenerates them (e.g. in tests)"""
+    _market_share_data.cache_clear()
+    _penetration_data.cache_clear()
+    _endpoints.cache_clear()
+    _brand_endpoints.cache_clear()
+    _fit_arima.cache_clear()
+
+def _float_formatter(values):
+    """
+    Fixed-point formatter for a float column, using as many decimals (at most 4)
+    as its values need. Rounding first hides float32 artifacts such as 23.860001.
+    """
+    decimals = max((len(repr(round(float(value), 4)).partition('.')[2]) for value in values), default=1)
+    return lambda value: f"{value:.{decimals}f}"
+
+def _frame_to_text(df):
+    """
+    Render a small DataFrame for the agent as an aligned plain-text table. Rows
+    are formatted straight from itertuples rather than through DataFrame.to_string.
+    """
+    float_cols = set(df.select_dtypes('floating').columns)
+    formatters = [_float_formatter(df[col].to_numpy()) if col in float_cols else str for col in df.columns]
+    
+    rows = [[str(col) for col in df.columns]]
+    for values in df.itertuples(index=False, name=None):
+        rows.append([fmt(value) for fmt, value in zip(formatters, values)])
+    
+    widths = [max(len(cell) for cell in column) for column in zip(*rows)]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+def _trend_forecast(values, horizon):
+    """Extend the series by its average month-over-month change (flat for a single value)"""
+    values = np.asarray(values, dtype=np.float64)
+    # The mean of the consecutive differences telescopes to (last - first) / (n - 1)
+    avg_change = (values[-1] - values[0]) / (len(values) - 1) if len(values) >= 2 else 0.0
+    return values[-1] + avg_change * np.arange(1, horizon + 1)
+
+@functools.lru_cache(maxsize=64)
+def _fit_arima(values_bytes, dtype):
+    """
+    Fit an ARIMA(1,1,0) model to a series passed as raw bytes plus its dtype string.
+    The datasets are deterministic, so repeat forecasts reuse the fitted model and
+    only run the forecast step (a failed fit is not cached).
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    return ARIMA(np.frombuffer(values_bytes, dtype=dtype), order=(1,1,0)).fit()
+
+class AnalysisTool(BaseTool):
+    """
+    Base class for the analysis tools; async calls run the pandas work in a worker
+    thread. The shared extractors expect the query already lowercased.
+    """
+    
+    async def _arun(self, query: str = ""):
+        return await asyncio.to_thread(self._run, query)
+    
+    def _extract_brand(self, query):
+        match = _BRAND_RE.search(query)
+        return match.group() if match else "oreo"  # default
+    
+    def _extract_region(self, query):
+        match = _REGION_RE.search(query)
+        return _REGION_NAMES[match.group()] if match else None
+    
+    def _extract_age_group(self, query):
+        match = _AGE_GROUP_RE.search(query)
+        return match.group() if match else None
+
+class MarketShareTool(AnalysisTool):
     name = "market_share_tool"
-    description = "Retrieves and analyzes market share data. Specify brand, region (optional), and time period."
+    description = TOOL_CONFIG['descriptions'][name]
     
     def _run(self, query: str = ""):
-        df = generate_market_share_data()
+        df = _market_share_data()
         
         # Parse query for filters
         query = query.lower()
@@ -24,40 +154,24 @@ class MarketShareTool(BaseTool):
         region_filter = self._extract_region(query)
         
         # Filter data
-        filtered_df = df[df['Brand'].str.lower() == brand_filter]
-        if region_filter:
-            filtered_df = filtered_df[filtered_df['Region'] == region_filter]
+        filtered_df = _select(df, Brand=_BRAND_NAMES[brand_filter], Region=region_filter)
         
         # Aggregate if necessary
         if region_filter is None:
-            filtered_df = filtered_df.groupby(['Month', 'Brand'], as_index=False).agg({
+            filtered_df = filtered_df.groupby(['Month', 'Brand'], as_index=False, observed=True).agg({
                 'MarketShare': 'mean',
                 'Price': 'mean',
                 'OnPromotion': 'sum'
             })
         
-        return filtered_df.to_string()
-    
-    def _extract_brand(self, query):
-        brands = ["oreo", "chipsahoy", "ritz", "belvita", "nutterbutter"]
-        for brand in brands:
-            if brand in query:
-                return brand
-        return "oreo"  # default
-    
-    def _extract_region(self, query):
-        regions = ["northeast", "southeast", "midwest", "west", "southwest"]
-        for region in regions:
-            if region in query:
-                return region.capitalize()
-        return None
+        return _frame_to_text(filtered_df)
 
-class PenetrationTool(BaseTool):
+class PenetrationTool(AnalysisTool):
     name = "penetration_tool"
-    description = "Retrieves and analyzes penetration data. Specify brand, age group (optional), region (optional), and time period."
+    description = TOOL_CONFIG['descriptions'][name]
     
     def _run(self, query: str = ""):
-        df = generate_penetration_data()
+        df = _penetration_data()
         
         # Parse query for filters
         query = query.lower()
@@ -66,86 +180,60 @@ class PenetrationTool(BaseTool):
         age_filter = self._extract_age_group(query)
         
         # Filter data
-        filtered_df = df[df['Brand'].str.lower() == brand_filter]
-        if region_filter:
-            filtered_df = filtered_df[filtered_df['Region'] == region_filter]
-        if age_filter:
-            filtered_df = filtered_df[filtered_df['AgeGroup'] == age_filter]
+        filtered_df = _select(df, Brand=_BRAND_NAMES[brand_filter], Region=region_filter,
+                              AgeGroup=age_filter)
         
         # Aggregate if necessary
         if region_filter is None and age_filter is None:
-            filtered_df = filtered_df.groupby(['Month', 'Brand'], as_index=False).agg({
+            filtered_df = filtered_df.groupby(['Month', 'Brand'], as_index=False, observed=True).agg({
                 'Penetration': 'mean',
                 'PurchaseFrequency': 'mean',
                 'LoyaltyScore': 'mean'
             })
         
-        return filtered_df.to_string()
-    
-    def _extract_brand(self, query):
-        brands = ["oreo", "chipsahoy", "ritz", "belvita", "nutterbutter"]
-        for brand in brands:
-            if brand in query:
-                return brand
-        return "oreo"  # default
-    
-    def _extract_region(self, query):
-        regions = ["northeast", "southeast", "midwest", "west", "southwest"]
-        for region in regions:
-            if region in query:
-                return region.capitalize()
-        return None
-    
-    def _extract_age_group(self, query):
-        age_groups = ["18-24", "25-34", "35-44", "45-54", "55+""]
-        for age in age_groups:
-            if age in query:
-                return age
-        return None
+        return _frame_to_text(filtered_df)
 
-class ComparisonTool(BaseTool):
+class ComparisonTool(AnalysisTool):
     name = "comparison_tool"
-    description = "Compares market share and penetration data with advanced analytics. Specify brands, regions, age groups, or metrics for comparison."
+    description = TOOL_CONFIG['descriptions'][name]
     
     def _run(self, query: str = ""):
+        from scipy import stats
+        
         # Get data
-        ms_df = generate_market_share_data()
-        pen_df = generate_penetration_data()
+        ms_df = _market_share_data()
+        pen_df = _penetration_data()
         
         # Extract parameters from query
+        query = query.lower()
         brand = self._extract_brand(query)
         region = self._extract_region(query)
         age_group = self._extract_age_group(query)
         
         # Filter and prepare data
-        ms_filtered = ms_df[ms_df['Brand'].str.lower() == brand]
-        pen_filtered = pen_df[pen_df['Brand'].str.lower() == brand]
-        
-        if region:
-            ms_filtered = ms_filtered[ms_filtered['Region'] == region]
-            pen_filtered = pen_filtered[pen_filtered['Region'] == region]
-        
-        if age_group:
-            pen_filtered = pen_filtered[pen_filtered['AgeGroup'] == age_group]
+        ms_filtered = _select(ms_df, Brand=_BRAND_NAMES[brand], Region=region)
+        pen_filtered = _select(pen_df, Brand=_BRAND_NAMES[brand], Region=region, AgeGroup=age_group)
         
         # Aggregate data
-        ms_agg = ms_filtered.groupby('Month', as_index=False)['MarketShare'].mean()
+        ms_agg = ms_filtered.groupby('Month', as_index=False, observed=True)['MarketShare'].mean()
         
         if age_group:
-            pen_agg = pen_filtered.groupby('Month', as_index=False)['Penetration'].mean()
+            pen_agg = pen_filtered.groupby('Month', as_index=False, observed=True)['Penetration'].mean()
         else:
-            pen_agg = pen_filtered.groupby(['Month'], as_index=False)['Penetration'].mean()
-        
-        # Merge datasets
-        merged_df = pd.merge(ms_agg, pen_agg, on='Month')
+            pen_agg = pen_filtered.groupby(['Month'], as_index=False, observed=True)['Penetration'].mean()
         
-        # Calculate correlation and perform analysis
-        correlation = merged_df["MarketShare"].corr(merged_df["Penetration"])
+        # Merge datasets; both sides are already sorted by month with one row per month
+        merged_df = pd.merge(ms_agg, pen_agg, on='Month', how='inner', validate='one_to_one', sort=False)
         
-        # Simple regression analysis
+        # Simple regression analysis; its r_value is the correlation coefficient
         slope, intercept, r_value, p_value, std_err = stats.linregress(
-            merged_df["MarketShare"], merged_df["Penetration"]
+            merged_df["MarketShare"].to_numpy(), merged_df["Penetration"].to_numpy()
         )
+        correlation = r_value
+        
+        # Period endpoints, shared by the trend lines and the insight
+        ms_start, ms_end = merged_df['MarketShare'].iat[0], merged_df['MarketShare'].iat[-1]
+        pen_start, pen_end = merged_df['Penetration'].iat[0], merged_df['Penetration'].iat[-1]
         
         # Create analysis text
         title = f"{brand.capitalize()} Market Share vs Penetration Analysis"
@@ -158,7 +246,7 @@ class ComparisonTool(BaseTool):
         {title}:
         
         1. Data Summary:
-           {merged_df.to_string()}
+           {_frame_to_text(merged_df)}
         
         2. Statistical Analysis:
            - Correlation coefficient: {correlation:.3f}
@@ -167,58 +255,35 @@ class ComparisonTool(BaseTool):
            - p-value: {p_value:.4f}
            
         3. Trend Analysis:
-           - Market Share trend: {self._get_trend(merged_df['MarketShare'])}
-           - Penetration trend: {self._get_trend(merged_df['Penetration'])}
+           - Market Share trend: {self._get_trend(ms_start, ms_end)}
+           - Penetration trend: {self._get_trend(pen_start, pen_end)}
            
         4. Monthly Growth Analysis:
            {self._calculate_growth_rates(merged_df)}
            
         5. Insight:
-           {self._generate_insight(correlation, merged_df, brand, region, age_group)}
+           {self._generate_insight(correlation, ms_end - ms_start, pen_end - pen_start, brand, region, age_group)}
         """
         
         return analysis
     
-    def _extract_brand(self, query):
-        brands = ["oreo", "chipsahoy", "ritz", "belvita", "nutterbutter"]
-        for brand in brands:
-            if brand in query.lower():
-                return brand
-        return "oreo"  # default
-    
-    def _extract_region(self, query):
-        regions = ["northeast", "southeast", "midwest", "west", "southwest"]
-        for region in regions:
-            if region in query.lower():
-                return region.capitalize()
-        return None
-    
-    def _extract_age_group(self, query):
-        age_groups = ["18-24", "25-34", "35-44", "45-54", "55+""]
-        for age in age_groups:
-            if age in query:
-                return age
-        return None
-    
-    def _get_trend(self, series):
-        if series.iloc[-1] > series.iloc[0]:
-            return f"Increasing over the period ({series.iloc[0]:.1f}% to {series.iloc[-1]:.1f}%)"
+    def _get_trend(self, start, end):
+        if end > start:
+            return f"Increasing over the period ({start:.1f}% to {end:.1f}%)"
         else:
-            return f"Decreasing over the period ({series.iloc[0]:.1f}% to {series.iloc[-1]:.1f}%)"
+            return f"Decreasing over the period ({start:.1f}% to {end:.1f}%)"
     
     def _calculate_growth_rates(self, df):
-        ms_growth = [(df['MarketShare'].iloc[i] - df['MarketShare'].iloc[i-1]) / df['MarketShare'].iloc[i-1] * 100 
-                     for i in range(1, len(df))]
-        pen_growth = [(df['Penetration'].iloc[i] - df['Penetration'].iloc[i-1]) / df['Penetration'].iloc[i-1] * 100 
-                      for i in range(1, len(df))]
+        # Month-over-month growth for both measures in one vectorized pass
+        growth = df[['MarketShare', 'Penetration']].pct_change().mul(100).iloc[1:]
         
-        result = ""
-        for i in range(len(ms_growth)):
-            result += f"Month {df['Month'].iloc[i+1]}: Market Share growth: {ms_growth[i]:.1f}%, Penetration growth: {pen_growth[i]:.1f}%\n"
+        lines = []
+        for month, ms_growth, pen_growth in zip(df['Month'].iloc[1:], growth['MarketShare'], growth['Penetration']):
+            lines.append(f"Month {month}: Market Share growth: {ms_growth:.1f}%, Penetration growth: {pen_growth:.1f}%\n")
         
-        return result
+        return "".join(lines)
     
-    def _generate_insight(self, correlation, df, brand, region, age_group):
+    def _generate_insight(self, correlation, ms_trend, pen_trend, brand, region, age_group):
         insights = []
         
         # Correlation insight
@@ -232,9 +297,6 @@ class ComparisonTool(BaseTool):
             insights.append(f"Negative correlation suggests that as penetration increases, market share actually decreases, which might indicate declining purchase frequency among buyers.")
             
         # Trend comparison
-        ms_trend = df['MarketShare'].iloc[-1] - df['MarketShare'].iloc[0]
-        pen_trend = df['Penetration'].iloc[-1] - df['Penetration'].iloc[0]
-        
         if ms_trend > 0 and pen_trend > 0:
             insights.append(f"{brand.capitalize()} is growing both in penetration and market share, indicating successful consumer acquisition and retention.")
         elif ms_trend > 0 and pen_trend <= 0:
@@ -253,29 +315,24 @@ class ComparisonTool(BaseTool):
         
         return " ".join(insights)
 
-class CompetitorAnalysisTool(BaseTool):
+class CompetitorAnalysisTool(AnalysisTool):
     name = "competitor_analysis_tool"
-    description = "Analyzes and compares multiple brands' performance. Specify brands, metrics (market share, penetration, etc.), and regions for comparison."
+    description = TOOL_CONFIG['descriptions'][name]
     
     def _run(self, query: str = ""):
-        # Get data
-        ms_df = generate_market_share_data()
-        pen_df = generate_penetration_data()
-        
         # Extract parameters from query
+        query = query.lower()
         brands_to_compare = self._extract_brands(query)
         region = self._extract_region(query)
         
-        # Filter by region if specified
-        if region:
-            ms_df = ms_df[ms_df['Region'] == region]
-            pen_df = pen_df[pen_df['Region'] == region]
+        # Get the per-brand first/last month values (for the region if specified)
+        endpoints = _brand_endpoints(region)
         
         # Create analysis based on market share trends
-        ms_analysis = self._analyze_market_shares(ms_df, brands_to_compare)
+        ms_analysis = self._summarize_changes(endpoints['MarketShare'], brands_to_compare)
         
         # Create analysis based on penetration
-        pen_analysis = self._analyze_penetration(pen_df, brands_to_compare)
+        pen_analysis = self._summarize_changes(endpoints['Penetration'], brands_to_compare)
         
         # Combined analysis
         title = "Competitor Analysis"
@@ -292,79 +349,45 @@ class CompetitorAnalysisTool(BaseTool):
         {pen_analysis}
         
         3. Competitive Landscape Overview:
-        {self._create_competitive_landscape(ms_df, pen_df, brands_to_compare)}
+        {self._create_competitive_landscape(endpoints, brands_to_compare)}
         """
         
         return analysis
     
     def _extract_brands(self, query):
-        brands = []
-        all_brands = ["oreo", "chipsahoy", "ritz", "belvita", "nutterbutter"]
+        mentioned = set(_BRAND_RE.findall(query))
         
-        for brand in all_brands:
-            if brand in query.lower():
-                brands.append(brand)
-        
-        # If no brands specified, use all
+        # Keep the standard brand order; if no brands specified, use all
+        brands = [brand for brand in _BRAND_NAMES if brand in mentioned]
         if not brands:
-            brands = all_brands
+            brands = list(_BRAND_NAMES)
             
         return brands
     
-    def _extract_region(self, query):
-        regions = ["northeast", "southeast", "midwest", "west", "southwest"]
-        for region in regions:
-            if region in query.lower():
-                return region.capitalize()
-        return None
-    
-    def _analyze_market_shares(self, df, brands):
-        result = ""
-        
+    def _summarize_changes(self, endpoints, brands):
+        lines = []
         for brand in brands:
-            brand_df = df[df['Brand'].str.lower() == brand].groupby('Month', as_index=False)['MarketShare'].mean()
+            if _BRAND_NAMES[brand] not in endpoints.index:
+                continue
             
-            if len(brand_df) > 0:
-                start_share = brand_df['MarketShare'].iloc[0]
-                end_share = brand_df['MarketShare'].iloc[-1]
-                change = end_share - start_share
-                change_pct = (change / start_share) * 100 if start_share > 0 else 0
-                
-                result += f"- {brand.capitalize()}: Started at {start_share:.1f}%, ended at {end_share:.1f}% "
-                result += f"({'+' if change >= 0 else ''}{change:.1f} points, {'+' if change_pct >= 0 else ''}{change_pct:.1f}%)\n"
-        
-        return result
-    
-    def _analyze_penetration(self, df, brands):
-        result = ""
-        
-        for brand in brands:
-            brand_df = df[df['Brand'].str.lower() == brand].groupby('Month', as_index=False)['Penetration'].mean()
+            start_value, end_value = endpoints.loc[_BRAND_NAMES[brand], ['first', 'last']]
+            change = end_value - start_value
+            change_pct = (change / start_value) * 100 if start_value > 0 else 0
             
-            if len(brand_df) > 0:
-                start_pen = brand_df['Penetration'].iloc[0]
-                end_pen = brand_df['Penetration'].iloc[-1]
-                change = end_pen - start_pen
-                change_pct = (change / start_pen) * 100 if start_pen > 0 else 0
-                
-                result += f"- {brand.capitalize()}: Started at {start_pen:.1f}%, ended at {end_pen:.1f}% "
-                result += f"({'+' if change >= 0 else ''}{change:.1f} points, {'+' if change_pct >= 0 else ''}{change_pct:.1f}%)\n"
+            lines.append(f"- {brand.capitalize()}: Started at {start_value:.1f}%, ended at {end_value:.1f}% "
+                         f"({'+' if change >= 0 else ''}{change:.1f} points, {'+' if change_pct >= 0 else ''}{change_pct:.1f}%)\n")
         
-        return result
+        return "".join(lines)
     
-    def _create_competitive_landscape(self, ms_df, pen_df, brands):
-        # Aggregate data for the latest month
-        latest_month = ms_df['Month'].max()
-        
-        ms_latest = ms_df[ms_df['Month'] == latest_month]
-        ms_summary = ms_latest.groupby('Brand', as_index=False)['MarketShare'].mean()
-        
-        pen_latest = pen_df[pen_df['Month'] == latest_month]
-        pen_summary = pen_latest.groupby('Brand', as_index=False)['Penetration'].mean()
-        
-        # Merge datasets
-        combined = pd.merge(ms_summary, pen_summary, on='Brand')
-        combined = combined[combined['Brand'].str.lower().isin([b.lower() for b in brands])]
+    def _create_competitive_landscape(self, endpoints, brands):
+        # Latest month values of both measures
+        combined = pd.DataFrame({
+            'MarketShare': endpoints[('MarketShare', 'last')],
+            'Penetration': endpoints[('Penetration', 'last')]
+        }).reset_index()
+        # Keep the requested brands by comparing integer category codes, not strings
+        brand_codes = combined['Brand'].cat.categories.get_indexer([_BRAND_NAMES[b] for b in brands])
+        combined = combined[np.isin(combined['Brand'].cat.codes.to_numpy(), brand_codes)]
         
         # Calculate share of market
         total_share = combined['MarketShare'].sum()
@@ -373,16 +396,16 @@ class CompetitorAnalysisTool(BaseTool):
         # Sort by market share
         combined = combined.sort_values('MarketShare', ascending=False)
         
-        result = "Current competitive standing (based on latest data):\n"
-        for _, row in combined.iterrows():
-            result += f"- {row['Brand']}: {row['MarketShare']:.1f}% market share ({row['ShareOfMarket']:.1f}% of measured brands), "
-            result += f"{row['Penetration']:.1f}% penetration\n"
+        lines = ["Current competitive standing (based on latest data):\n"]
+        for row in combined.itertuples(index=False):
+            lines.append(f"- {row.Brand}: {row.MarketShare:.1f}% market share ({row.ShareOfMarket:.1f}% of measured brands), "
+                         f"{row.Penetration:.1f}% penetration\n")
             
-        return result
+        return "".join(lines)
 
-class ForecastingTool(BaseTool):
+class ForecastingTool(AnalysisTool):
     name = "forecasting_tool"
-    description = "Forecasts future market share or penetration based on current trends. Specify brand, metric (market share or penetration), and time horizon."
+    description = TOOL_CONFIG['descriptions'][name]
     
     def _run(self, query: str = ""):
         # Parse query for parameters
@@ -393,15 +416,15 @@ class ForecastingTool(BaseTool):
         
         # Get appropriate data
         if metric == "market_share":
-            df = generate_market_share_data()
-            df_filtered = df[df['Brand'].str.lower() == brand]
-            df_agg = df_filtered.groupby('Month', as_index=False)['MarketShare'].mean()
+            df = _market_share_data()
+            df_filtered = _select(df, Brand=_BRAND_NAMES[brand])
+            df_agg = df_filtered.groupby('Month', as_index=False, observed=True)['MarketShare'].mean()
             metric_name = "Market Share"
             values = df_agg['MarketShare'].values
         else:
-            df = generate_penetration_data()
-            df_filtered = df[df['Brand'].str.lower() == brand]
-            df_agg = df_filtered.groupby('Month', as_index=False)['Penetration'].mean()
+            df = _penetration_data()
+            df_filtered = _select(df, Brand=_BRAND_NAMES[brand])
+            df_agg = df_filtered.groupby('Month', as_index=False, observed=True)['Penetration'].mean()
             metric_name = "Penetration"
             values = df_agg['Penetration'].values
         
@@ -409,25 +432,29 @@ class ForecastingTool(BaseTool):
         forecast = self._generate_forecast(values, horizon)
         
         # Prepare forecast data
-        last_month = pd.to_datetime(df_agg['Month'].iloc[-1])
-        forecast_months = pd.date_range(start=last_month + pd.DateOffset(months=1), periods=horizon, freq='M')
-        forecast_months_str = [m.strftime('%Y-%m') for m in forecast_months]
+        # Month labels are 'YYYY-MM', so month arithmetic on datetime64[M] gives the following months
+        last_month = np.datetime64(df_agg['Month'].iloc[-1], 'M')
+        forecast_months_str = np.datetime_as_string(last_month + np.arange(1, horizon + 1), unit='M')
         
         # Prepare forecast results
-        forecast_result = "\nForecast:\n"
-        for i, month in enumerate(forecast_months_str):
-            forecast_result += f"{month}: {forecast[i]:.2f}%\n"
+        forecast_lines = ["\nForecast:\n"]
+        for month, value in zip(forecast_months_str, forecast):
+            forecast_lines.append(f"{month}: {value:.2f}%\n")
+        forecast_result = "".join(forecast_lines)
+        
+        # Forecast summary statistics, computed once for the insight text
+        trend, trend_pct, volatility = self._forecast_stats(values[-1], forecast)
         
         analysis = f"""
         {brand.capitalize()} {metric_name} Forecast Analysis:
         
         Historical Data:
-        {df_agg.to_string()}
+        {_frame_to_text(df_agg)}
         
         {forecast_result}
         
         Forecast Insights:
-        {self._generate_forecast_insight(values[-1], forecast, brand, metric_name)}
+        {self._generate_forecast_insight(trend, trend_pct, volatility, brand, metric_name)}
         """
         
         return analysis
@@ -438,13 +465,6 @@ class ForecastingTool(BaseTool):
         else:
             return "penetration"
     
-    def _extract_brand(self, query):
-        brands = ["oreo", "chipsahoy", "ritz", "belvita", "nutterbutter"]
-        for brand in brands:
-            if brand in query:
-                return brand
-        return "oreo"  # default
-    
     def _extract_forecast_horizon(self, query):
         horizon = 3  # default
         if "month" in query:
@@ -455,25 +475,27 @@ class ForecastingTool(BaseTool):
         return horizon
     
     def _generate_forecast(self, values, horizon):
+        # Too few observations to fit ARIMA; use the simple trend-based forecast
+        if len(values) < TOOL_CONFIG['forecasting']['min_arima_observations']:
+            return _trend_forecast(values, horizon)
+        
         # Simple ARIMA forecasting
         try:
-            model = ARIMA(values, order=(1,1,0))
-            model_fit = model.fit()
+            model_fit = _fit_arima(values.tobytes(), values.dtype.str)
             forecast = model_fit.forecast(steps=horizon)
             return forecast
-        except:
-            # Fallback to simple trend-based forecast if ARIMA fails
-            last_value = values[-1]
-            if len(values) >= 2:
-                avg_change = np.mean([values[i] - values[i-1] for i in range(1, len(values))])
-                return [last_value + avg_change * (i+1) for i in range(horizon)]
-            else:
-                return [last_value] * horizon
+        except (np.linalg.LinAlgError, ValueError):
+            # Fallback to simple trend-based forecast if the fit fails numerically
+            return _trend_forecast(values, horizon)
     
-    def _generate_forecast_insight(self, last_value, forecast_values, brand, metric):
+    def _forecast_stats(self, last_value, forecast_values):
+        """Projected change in points and percent, and the forecast std dev (None for fewer than 3 points)"""
         trend = forecast_values[-1] - last_value
         trend_pct = (trend / last_value) * 100 if last_value > 0 else 0
-        
+        volatility = np.std(forecast_values) if len(forecast_values) >= 3 else None
+        return trend, trend_pct, volatility
+    
+    def _generate_forecast_insight(self, trend, trend_pct, volatility, brand, metric):
         if trend > 0:
             direction = "increasing"
             sentiment = "positive" if trend_pct > 5 else "modestly positive"
@@ -489,8 +511,7 @@ class ForecastingTool(BaseTool):
         insight += f"This suggests a {sentiment} outlook for the brand in this metric."
         
         # Add volatility assessment if we have enough forecast points
-        if len(forecast_values) >= 3:
-            volatility = np.std(forecast_values)
+        if volatility is not None:
             if volatility > 1.0:
                 insight += f" There is significant volatility in the forecast (std dev: {volatility:.2f}), suggesting uncertainty."
             elif volatility > 0.5: